@@ -5,12 +5,18 @@ Provides tools for interacting with TiDB database
 """
 
 import asyncio
-import json
+import contextlib
 import os
+import re
+import ssl
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
-import pymysql
+import asyncmy
+import asyncmy.errors
+import orjson
+from asyncmy.cursors import Cursor, DictCursor, SSDictCursor
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -19,34 +25,156 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+# Upper bounds on the rows and serialized size of an execute_sql response;
+# anything beyond them is summarized in a truncation footer
+MAX_ROWS = 500
+MAX_RESULT_BYTES = 512 * 1024
+
+# Leading keyword of statements that return a result set. match() is anchored
+# and stops after the first word, so long queries are never copied or upper-cased.
+# WITH is left out: a CTE can precede UPDATE or DELETE as well as SELECT. So is
+# EXPLAIN ANALYZE, which really executes the statement it explains.
+_READ_RE = re.compile(
+    r"\s*(?:SELECT|SHOW|DESCRIBE|DESC|EXPLAIN(?!\s+ANALYZE\b))\b", re.IGNORECASE
+)
+
+# SELECTs containing any of these are sent as-is rather than given an automatic
+# LIMIT (a LIMIT already exists, or the clause would have to follow the LIMIT)
+_NO_AUTO_LIMIT_RE = re.compile(
+    r"\b(?:limit|into|for\s+(?:update|share)|lock\s+in\s+share\s+mode)\b", re.IGNORECASE
+)
+
+# Connection settings, read once at startup
+TIDB_HOST = os.getenv("TIDB_HOST", "localhost")
+TIDB_PORT = int(os.getenv("TIDB_PORT", "4000"))
+TIDB_USERNAME = os.getenv("TIDB_USERNAME", "root")
+TIDB_PASSWORD = os.getenv("TIDB_PASSWORD", "")
+TIDB_DATABASE = os.getenv("TIDB_DATABASE", "test")
+
+# TLS context shared by every pooled connection (plain TCP for a local server)
+SSL_CONTEXT = ssl.create_default_context() if TIDB_HOST != "localhost" else None
+
+# Static queries, kept as constants so the driver's statement cache sees identical text
+_SQL_TABLE_COLUMNS = """
+    SELECT
+        table_name,
+        table_rows,
+        data_length,
+        index_length,
+        auto_increment,
+        table_comment
+    FROM information_schema.tables
+"""
+_SQL_TABLE_ONE = _SQL_TABLE_COLUMNS + "WHERE table_schema = %s AND table_name = %s"
+# Unordered: rows are sorted by total size client-side
+_SQL_TABLE_ALL = _SQL_TABLE_COLUMNS + "WHERE table_schema = %s"
+
+# Three statements sent as one request (asyncmy always negotiates CLIENT_MULTI_STATEMENTS)
+_SQL_DB_STATS = """
+    SELECT DATABASE() as current_db, VERSION() as version;
+    SELECT
+        COUNT(*) as table_count,
+        SUM(table_rows) as total_rows,
+        SUM(data_length) as total_data_size,
+        SUM(index_length) as total_index_size,
+        SUM(data_length + index_length) as total_size
+    FROM information_schema.tables
+    WHERE table_schema = %s;
+    SHOW STATUS LIKE 'Threads_connected'
+"""
+
 
 class TiDBConnection:
-    """TiDB database connection manager"""
-    
+    """TiDB database connection pool manager"""
+
     def __init__(self):
-        self.host = os.getenv("TIDB_HOST", "localhost")
-        self.port = int(os.getenv("TIDB_PORT", "4000"))
-        self.username = os.getenv("TIDB_USERNAME", "root")
-        self.password = os.getenv("TIDB_PASSWORD", "")
-        self.database = os.getenv("TIDB_DATABASE", "test")
-        
-    def get_connection(self):
-        """Get a database connection"""
-        return pymysql.connect(
-            host=self.host,
-            port=self.port,
-            user=self.username,
-            password=self.password,
-            database=self.database,
-            ssl={'ssl': True} if self.host != "localhost" else None,
-            cursorclass=pymysql.cursors.DictCursor
+        self.pool = None
+        self._keepalive_task = None
+
+    async def create_pool(self):
+        """Create and warm the connection pool shared by all tool calls"""
+        self.pool = await asyncmy.create_pool(
+            host=TIDB_HOST,
+            port=TIDB_PORT,
+            user=TIDB_USERNAME,
+            password=TIDB_PASSWORD,
+            database=TIDB_DATABASE,
+            ssl=SSL_CONTEXT,
+            # Connections outlive a single tool call, so never leave a
+            # transaction (and its read snapshot) open on a pooled connection
+            autocommit=True,
+            # Parameterized queries run as cached server-side prepared statements
+            stmt_cache_size=8,
+            minsize=5,
+            maxsize=20
         )
+        # Complete a round-trip on every initial connection now, so the first
+        # tool calls don't pay for a slow handshake or find a dead socket
+        await self._ping_connections(self.pool.minsize)
+        self._keepalive_task = asyncio.create_task(self._keepalive())
+
+    async def _ping_connections(self, count: int):
+        """Hold `count` pooled connections at once and ping them concurrently"""
+        async with contextlib.AsyncExitStack() as stack:
+            connections = [
+                await stack.enter_async_context(self.pool.acquire())
+                for _ in range(count)
+            ]
+            await asyncio.gather(*(connection.ping() for connection in connections))
+
+    async def _keepalive(self, interval: int = 60):
+        """Periodically ping idle connections so intermediate load balancers don't drop them"""
+        while True:
+            await asyncio.sleep(interval)
+            # One connection at a time, so a tool call arriving meanwhile still finds
+            # an idle connection instead of making the pool open a new one. Released
+            # connections go to the back of the free queue, so each is visited once.
+            for _ in range(self.pool.freesize):
+                try:
+                    async with self.pool.acquire() as connection:
+                        await connection.ping()
+                except Exception:
+                    # ping() reconnects broken connections; anything else is retried next round
+                    pass
+
+    async def close_pool(self):
+        """Close the connection pool"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
 
 
 # Initialize the server
 server = Server("tidb-custom-mcp")
 db = TiDBConnection()
 
+# Rendered get_table_info / get_database_stats reports. information_schema
+# only changes on DDL or ANALYZE, so a short TTL is acceptable; writes made
+# through execute_sql or benchmark_query invalidate it. Cache access never
+# awaits, so no lock is needed.
+_report_cache = TTLCache(maxsize=64, ttl=30)
+# Bumped on every invalidation, so a report built across one is not stored
+_report_generation = 0
+
+
+def _invalidate_reports():
+    """Drop cached reports, including any still being built"""
+    global _report_generation
+    _report_generation += 1
+    _report_cache.clear()
+
+
+def _store_report(key: Any, text: str, generation: int):
+    """Cache a report unless a write invalidated the cache while it was built"""
+    if generation == _report_generation:
+        _report_cache[key] = text
+
 
 @server.list_tools()
 async def list_tools() -> List[Tool]:
@@ -108,6 +236,13 @@ async def list_tools() -> List[Tool]:
                         "default": 5,
                         "minimum": 1,
                         "maximum": 50
+                    },
+                    "concurrency": {
+                        "type": "integer",
+                        "description": "Number of pooled connections running the query in parallel",
+                        "default": 1,
+                        "minimum": 1,
+                        "maximum": 20
                     }
                 },
                 "required": ["query"]
@@ -119,238 +254,396 @@ async def list_tools() -> List[Tool]:
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls"""
-    
+
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return _text(f"Unknown tool: {name}")
+
     try:
-        if name == "execute_sql":
-            return await execute_sql(arguments)
-        elif name == "get_table_info":
-            return await get_table_info(arguments)
-        elif name == "get_database_stats":
-            return await get_database_stats(arguments)
-        elif name == "benchmark_query":
-            return await benchmark_query(arguments)
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
-            
+        return await handler(arguments)
     except Exception as e:
-        return [TextContent(type="text", text=f"Error: {str(e)}")]
+        return _text(f"Error: {str(e)}")
+
+
+def _text(text: str) -> List[TextContent]:
+    """Wrap a tool's text output as an MCP response"""
+    return [TextContent(type="text", text=text)]
+
+
+def _is_read(query: str) -> bool:
+    """Check whether a query returns a result set (only its first keyword is inspected)"""
+    return _READ_RE.match(query) is not None
+
+
+def _json_default(value: Any) -> str:
+    """Serialize column values orjson has no native encoding for (DECIMAL, BLOB, TIME)"""
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+def _auto_limit(query: str) -> Optional[str]:
+    """Append a LIMIT to a SELECT without one so the server returns at most MAX_ROWS + 1 rows"""
+    select = query.strip().rstrip(";").rstrip()
+    # A remaining ';' means stacked statements, where the LIMIT would land on the last one
+    if select[:6].upper() != "SELECT" or ";" in select or _NO_AUTO_LIMIT_RE.search(select):
+        return None
+    # The newline keeps a trailing "-- comment" from swallowing the LIMIT
+    return f"{select}\nLIMIT {MAX_ROWS + 1}"
+
+
+async def _drain_results(cursor) -> List[str]:
+    """Read the results of any statements after the first, summarizing each one"""
+    summaries = []
+    while await cursor.nextset():
+        if cursor.description is not None:
+            row_count = 0
+            async for _ in cursor:
+                row_count += 1
+            summaries.append(f"{row_count} rows returned (not shown)")
+        else:
+            summaries.append(f"{cursor.rowcount} affected rows")
+    return summaries
 
 
 async def execute_sql(arguments: Dict[str, Any]) -> List[TextContent]:
     """Execute SQL query"""
     query = arguments["query"]
     measure_time = arguments.get("measure_time", False)
-    
-    connection = db.get_connection()
-    try:
-        cursor = connection.cursor()
-        
-        start_time = time.time() if measure_time else None
-        cursor.execute(query)
-        end_time = time.time() if measure_time else None
-        
-        # Handle different types of queries
-        if query.strip().upper().startswith(('SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN')):
-            results = cursor.fetchall()
-            result_text = f"Query executed successfully.\n"
-            
-            if measure_time:
-                execution_time = (end_time - start_time) * 1000
-                result_text += f"Execution time: {execution_time:.2f} ms\n"
-            
-            result_text += f"Rows returned: {len(results)}\n\n"
-            
-            if results:
-                result_text += json.dumps(results, indent=2, default=str)
+    is_read = _is_read(query)
+    limited_query = _auto_limit(query) if is_read else None
+
+    async with db.pool.acquire() as connection:
+        # Unbuffered cursor: rows are read from the server only as they are consumed
+        async with connection.cursor(SSDictCursor) as cursor:
+            start = time.perf_counter_ns() if measure_time else None
+            await cursor.execute(limited_query or query)
+
+            # Handle different types of queries. Go by whether the server sent a
+            # result set, since CALL, ADMIN SHOW ... or a SELECT behind a comment
+            # return rows without a read keyword up front
+            if cursor.description is not None:
+                wrote = False
+                fetched = []
+                total_rows = 0
+                # Keep at most MAX_ROWS rows; later ones are only counted
+                async for row in cursor:
+                    total_rows += 1
+                    if len(fetched) < MAX_ROWS:
+                        fetched.append(row)
+                # The unbuffered execute() returns after the column definitions, so
+                # stop the clock once every row has been received (but before any
+                # client-side serialization, matching what fetchall() timing covered)
+                elapsed_ns = time.perf_counter_ns() - start if measure_time else None
+
+                rows = []
+                size = 0
+                full = False
+                for row in fetched:
+                    encoded = orjson.dumps(row, default=_json_default)
+                    if size + len(encoded) > MAX_RESULT_BYTES:
+                        # Stop at the first row that doesn't fit so the shown rows stay contiguous
+                        full = True
+                        break
+                    rows.append(encoded)
+                    size += len(encoded)
+
+                result_text = f"Query executed successfully.\n"
+
+                if measure_time:
+                    execution_time = elapsed_ns / 1_000_000
+                    result_text += f"Execution time: {execution_time:.2f} ms\n"
+
+                # The automatic LIMIT fetches one extra row only to detect that more exist
+                more_rows = limited_query is not None and total_rows > MAX_ROWS
+                if more_rows:
+                    result_text += f"Rows returned: more than {MAX_ROWS} (automatic LIMIT applied)\n\n"
+                else:
+                    result_text += f"Rows returned: {total_rows}\n\n"
+
+                if rows:
+                    result_text += "[\n  " + b",\n  ".join(rows).decode() + "\n]"
+                elif not total_rows:
+                    result_text += "No rows returned."
+
+                if total_rows > len(rows):
+                    shown = (
+                        f"showing first {len(rows)} rows" if more_rows
+                        else f"showing {len(rows)} of {total_rows} rows"
+                    )
+                    reason = (
+                        f"the next row would exceed the {MAX_RESULT_BYTES:,}-byte response limit"
+                        if full else f"at most {MAX_ROWS} rows are returned"
+                    )
+                    if rows:
+                        result_text += "\n\n"
+                    result_text += (
+                        f"...truncated: {shown} ({reason}). Add a LIMIT clause, a narrower "
+                        f"WHERE clause or select fewer columns to see specific rows."
+                    )
+
             else:
-                result_text += "No rows returned."
-                
-        else:
-            # For INSERT, UPDATE, DELETE, etc.
-            connection.commit()
-            affected_rows = cursor.rowcount
-            result_text = f"Query executed successfully.\n"
-            
-            if measure_time:
-                execution_time = (end_time - start_time) * 1000
-                result_text += f"Execution time: {execution_time:.2f} ms\n"
-            
-            result_text += f"Affected rows: {affected_rows}"
-        
-        return [TextContent(type="text", text=result_text)]
-        
-    finally:
-        connection.close()
+                # For INSERT, UPDATE, DELETE, etc.
+                elapsed_ns = time.perf_counter_ns() - start if measure_time else None
+                wrote = True
+                affected_rows = cursor.rowcount
+                result_text = f"Query executed successfully.\n"
+
+                if measure_time:
+                    execution_time = elapsed_ns / 1_000_000
+                    result_text += f"Execution time: {execution_time:.2f} ms\n"
+
+                result_text += f"Affected rows: {affected_rows}"
+
+            # asyncmy always negotiates CLIENT_MULTI_STATEMENTS, so every statement
+            # of a stacked query has already run; report the ones after the first
+            extra_results = await _drain_results(cursor)
+            if extra_results:
+                result_text += "\n\nAdditional statements:\n" + "".join(
+                    f"  {i}. {summary}\n" for i, summary in enumerate(extra_results, 2)
+                )
+
+            # Anything outside the read set may have written, even if it returned
+            # rows (CALL on a modifying procedure, EXPLAIN ANALYZE DELETE ...)
+            if wrote or extra_results or not is_read:
+                await connection.commit()
+                _invalidate_reports()
+
+    return _text(result_text)
+
+
+def _fmt_bytes(n: int, _inv: float = 1.0 / 1048576) -> str:
+    """Format a byte count with its size in MB"""
+    return f"{n:,} bytes ({n * _inv:.2f} MB)"
 
 
 async def get_table_info(arguments: Dict[str, Any]) -> List[TextContent]:
     """Get table information"""
     table_name = arguments.get("table_name")
-    
-    connection = db.get_connection()
-    try:
-        cursor = connection.cursor()
-        
-        if table_name:
-            # Get specific table info
-            cursor.execute("""
-                SELECT 
-                    table_name,
-                    table_rows,
-                    data_length,
-                    index_length,
-                    (data_length + index_length) as total_size,
-                    auto_increment,
-                    table_comment
-                FROM information_schema.tables 
-                WHERE table_schema = %s AND table_name = %s
-            """, (db.database, table_name))
-        else:
-            # Get all tables info
-            cursor.execute("""
-                SELECT 
-                    table_name,
-                    table_rows,
-                    data_length,
-                    index_length,
-                    (data_length + index_length) as total_size,
-                    auto_increment,
-                    table_comment
-                FROM information_schema.tables 
-                WHERE table_schema = %s
-                ORDER BY total_size DESC
-            """, (db.database,))
-        
-        results = cursor.fetchall()
-        
-        if not results:
-            return [TextContent(type="text", text="No tables found.")]
-        
-        result_text = "Table Information:\n\n"
-        
-        for table in results:
-            result_text += f"Table: {table['table_name']}\n"
-            result_text += f"  Rows: {table['table_rows']:,}\n"
-            result_text += f"  Data size: {table['data_length']:,} bytes ({table['data_length']/1024/1024:.2f} MB)\n"
-            result_text += f"  Index size: {table['index_length']:,} bytes ({table['index_length']/1024/1024:.2f} MB)\n"
-            result_text += f"  Total size: {table['total_size']:,} bytes ({table['total_size']/1024/1024:.2f} MB)\n"
-            if table['auto_increment']:
-                result_text += f"  Auto increment: {table['auto_increment']}\n"
-            if table['table_comment']:
-                result_text += f"  Comment: {table['table_comment']}\n"
-            result_text += "\n"
-        
-        return [TextContent(type="text", text=result_text)]
-        
-    finally:
-        connection.close()
+    cache_key = ("table_info", table_name or "*")
+    cached = _report_cache.get(cache_key)
+    if cached is not None:
+        return _text(cached)
+    generation = _report_generation
+
+    async with db.pool.acquire() as connection:
+        async with connection.cursor(DictCursor) as cursor:
+            if table_name:
+                await cursor.execute(_SQL_TABLE_ONE, (TIDB_DATABASE, table_name))
+            else:
+                await cursor.execute(_SQL_TABLE_ALL, (TIDB_DATABASE,))
+
+            results = await cursor.fetchall()
+
+    if not results:
+        return _text("No tables found.")
+
+    # Views and some system tables report NULL for these; show them as 0
+    for table in results:
+        table['table_rows'] = table['table_rows'] or 0
+        table['data_length'] = table['data_length'] or 0
+        table['index_length'] = table['index_length'] or 0
+        table['total_size'] = table['data_length'] + table['index_length']
+    results.sort(key=lambda table: table['total_size'], reverse=True)
+
+    parts = ["Table Information:\n\n"]
+
+    for table in results:
+        parts.append(
+            f"Table: {table['table_name']}\n"
+            f"  Rows: {table['table_rows']:,}\n"
+            f"  Data size: {_fmt_bytes(table['data_length'])}\n"
+            f"  Index size: {_fmt_bytes(table['index_length'])}\n"
+            f"  Total size: {_fmt_bytes(table['total_size'])}\n"
+        )
+        if table['auto_increment']:
+            parts.append(f"  Auto increment: {table['auto_increment']}\n")
+        if table['table_comment']:
+            parts.append(f"  Comment: {table['table_comment']}\n")
+        parts.append("\n")
+
+    result_text = "".join(parts)
+    _store_report(cache_key, result_text, generation)
+
+    return _text(result_text)
 
 
 async def get_database_stats(arguments: Dict[str, Any]) -> List[TextContent]:
     """Get comprehensive database statistics"""
-    connection = db.get_connection()
+    cached = _report_cache.get("__stats__")
+    if cached is not None:
+        return _text(cached)
+    generation = _report_generation
+
+    async with db.pool.acquire() as connection:
+        # Single-row results read positionally, so a plain tuple cursor is enough
+        async with connection.cursor(Cursor) as cursor:
+            # Database info, table totals and connection count in one round-trip
+            # Escaped client-side with mogrify() and sent without args: with args the
+            # statement cache would first try (and fail) to prepare the multi-statement text
+            await cursor.execute(cursor.mogrify(_SQL_DB_STATS, (TIDB_DATABASE,)))
+
+            current_db, version = await cursor.fetchone()
+            await cursor.nextset()
+            table_count, total_rows, total_data_size, total_index_size, total_size = await cursor.fetchone()
+            await cursor.nextset()
+            connections = await cursor.fetchone()  # (Variable_name, Value)
+
+    # SUM() comes back as DECIMAL (or NULL for an empty schema)
+    total_rows = int(total_rows or 0)
+    total_data_size = int(total_data_size or 0)
+    total_index_size = int(total_index_size or 0)
+    total_size = int(total_size or 0)
+
+    result_text = (
+        f"Database Statistics\n"
+        f"==================\n\n"
+        f"Database: {current_db}\n"
+        f"Version: {version}\n"
+        f"Host: {TIDB_HOST}:{TIDB_PORT}\n\n"
+        f"Table Statistics:\n"
+        f"  Total tables: {table_count}\n"
+        f"  Total rows: {total_rows:,}\n"
+        f"  Data size: {_fmt_bytes(total_data_size)}\n"
+        f"  Index size: {_fmt_bytes(total_index_size)}\n"
+        f"  Total size: {_fmt_bytes(total_size)}\n\n"
+    )
+
+    if connections:
+        result_text += f"Active connections: {connections[1]}\n"
+
+    _store_report("__stats__", result_text, generation)
+    return _text(result_text)
+
+
+async def _prepare(connection, query: str):
+    """Prepare a query server-side, or return None if it cannot be prepared"""
     try:
-        cursor = connection.cursor()
-        
-        # Database basic info
-        cursor.execute("SELECT DATABASE() as current_db, VERSION() as version")
-        db_info = cursor.fetchone()
-        
-        # Total tables and size
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as table_count,
-                SUM(table_rows) as total_rows,
-                SUM(data_length) as total_data_size,
-                SUM(index_length) as total_index_size,
-                SUM(data_length + index_length) as total_size
-            FROM information_schema.tables 
-            WHERE table_schema = %s
-        """, (db.database,))
-        
-        stats = cursor.fetchone()
-        
-        # Connection info
-        cursor.execute("SHOW STATUS LIKE 'Threads_connected'")
-        connections = cursor.fetchone()
-        
-        result_text = f"Database Statistics\n"
-        result_text += f"==================\n\n"
-        result_text += f"Database: {db_info['current_db']}\n"
-        result_text += f"Version: {db_info['version']}\n"
-        result_text += f"Host: {db.host}:{db.port}\n\n"
-        
-        result_text += f"Table Statistics:\n"
-        result_text += f"  Total tables: {stats['table_count']}\n"
-        result_text += f"  Total rows: {stats['total_rows']:,}\n"
-        result_text += f"  Data size: {stats['total_data_size']:,} bytes ({stats['total_data_size']/1024/1024:.2f} MB)\n"
-        result_text += f"  Index size: {stats['total_index_size']:,} bytes ({stats['total_index_size']/1024/1024:.2f} MB)\n"
-        result_text += f"  Total size: {stats['total_size']:,} bytes ({stats['total_size']/1024/1024:.2f} MB)\n\n"
-        
-        if connections:
-            result_text += f"Active connections: {connections['Value']}\n"
-        
-        return [TextContent(type="text", text=result_text)]
-        
-    finally:
-        connection.close()
+        statement = await connection.prepare(query)
+    except asyncmy.errors.Error:
+        # Not every statement can be prepared; the text protocol still works
+        return None
+    if statement.parameter_count:
+        # A stray '?' placeholder has no value to bind
+        await statement.close()
+        return None
+    return statement
 
 
 async def benchmark_query(arguments: Dict[str, Any]) -> List[TextContent]:
     """Benchmark a query by running it multiple times"""
     query = arguments["query"]
     iterations = arguments.get("iterations", 5)
-    
+
     if iterations > 50:
         iterations = 50
-    
-    times = []
-    connection = db.get_connection()
-    
+
+    concurrency = arguments.get("concurrency", 1)
+
+    if concurrency > db.pool.maxsize:
+        concurrency = db.pool.maxsize
+    if concurrency > iterations:
+        concurrency = iterations
+    if concurrency < 1:
+        concurrency = 1
+
+    times: List[int] = []  # nanoseconds
+    is_read = _is_read(query)
+    remaining = iterations
+
+    async def worker() -> bool:
+        """Run iterations on one pooled connection until none are left"""
+        nonlocal remaining
+        async with db.pool.acquire() as connection:
+            # Pooled connections autocommit, so always run inside a transaction that
+            # is rolled back: the leading keyword can't rule out writes (stacked
+            # statements, EXPLAIN ANALYZE on DML), and benchmarking must not change data
+            await connection.begin()
+            # Prepared statements belong to a connection, so each worker prepares its own
+            statement = await _prepare(connection, query)
+            try:
+                # Benchmark rows are discarded, so skip building dicts for them
+                async with connection.cursor(Cursor) as cursor:
+                    async def run_once():
+                        if statement is not None:
+                            # Rows are read as part of the binary-protocol execute
+                            await statement.execute()
+                        else:
+                            await cursor.execute(query)
+                            if is_read:
+                                await cursor.fetchall()
+
+                    # Warm-up run
+                    await run_once()
+
+                    # Benchmark runs
+                    while remaining > 0:
+                        remaining -= 1
+                        start = time.perf_counter_ns()
+                        await run_once()
+                        times.append(time.perf_counter_ns() - start)
+            finally:
+                if statement is not None:
+                    await statement.close()
+                await connection.rollback()
+        return statement is not None
+
+    wall_start = time.perf_counter_ns()
+    tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
     try:
-        cursor = connection.cursor()
-        
-        # Warm-up run
-        cursor.execute(query)
-        if query.strip().upper().startswith(('SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN')):
-            cursor.fetchall()
-        
-        # Benchmark runs
-        for i in range(iterations):
-            start_time = time.time()
-            cursor.execute(query)
-            if query.strip().upper().startswith(('SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN')):
-                results = cursor.fetchall()
-            end_time = time.time()
-            
-            execution_time = (end_time - start_time) * 1000  # Convert to milliseconds
-            times.append(execution_time)
-        
-        # Calculate statistics
-        avg_time = sum(times) / len(times)
-        min_time = min(times)
-        max_time = max(times)
-        
-        result_text = f"Query Benchmark Results\n"
-        result_text += f"======================\n\n"
-        result_text += f"Query: {query}\n"
-        result_text += f"Iterations: {iterations}\n\n"
-        result_text += f"Average execution time: {avg_time:.2f} ms\n"
-        result_text += f"Minimum execution time: {min_time:.2f} ms\n"
-        result_text += f"Maximum execution time: {max_time:.2f} ms\n\n"
-        result_text += f"Individual times: {[f'{t:.2f}' for t in times]} ms\n"
-        
-        return [TextContent(type="text", text=result_text)]
-        
+        prepared = await asyncio.gather(*tasks)
+    except BaseException:
+        # Stop the other workers too, and wait until they have rolled back and
+        # returned their connections to the pool before reporting the error
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
     finally:
-        connection.close()
+        # Writes are rolled back, but DDL commits implicitly in TiDB
+        _invalidate_reports()
+    wall_time = (time.perf_counter_ns() - wall_start) / 1_000_000
+
+    # Calculate statistics, converting nanoseconds to milliseconds only for display
+    avg_time = sum(times) // len(times) / 1_000_000
+    min_time = min(times) / 1_000_000
+    max_time = max(times) / 1_000_000
+
+    result_text = (
+        f"Query Benchmark Results\n"
+        f"======================\n\n"
+        f"Query: {query}\n"
+        f"Iterations: {iterations}\n"
+        f"Concurrency: {concurrency}\n"
+        f"Protocol: {'prepared statement' if all(prepared) else 'text'}\n\n"
+        f"Average execution time: {avg_time:.2f} ms\n"
+        f"Minimum execution time: {min_time:.2f} ms\n"
+        f"Maximum execution time: {max_time:.2f} ms\n"
+        f"Total wall-clock time: {wall_time:.2f} ms\n\n"
+        f"Individual times: {[f'{t / 1_000_000:.2f}' for t in times]} ms\n"
+    )
+
+    return _text(result_text)
+
+
+# Tool name -> handler, used by call_tool
+_HANDLERS = {
+    "execute_sql": execute_sql,
+    "get_table_info": get_table_info,
+    "get_database_stats": get_database_stats,
+    "benchmark_query": benchmark_query,
+}
 
 
 async def main():
     """Main server function"""
     async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+        await db.create_pool()
+        try:
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+        finally:
+            await db.close_pool()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())